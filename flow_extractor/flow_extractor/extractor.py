@@ -1,5 +1,19 @@
 import subprocess
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
+from typing import List, Optional
+
+
+def _run_cicflowmeter(pcap_path: Path, output_path: Path) -> Path:
+    """Run one cicflowmeter subprocess (module-level so it pickles to workers)."""
+    cmd = [
+        "cicflowmeter",
+        "-f", str(pcap_path),
+        "-c",
+        str(output_path)
+    ]
+    subprocess.run(cmd, check=True)
+    return output_path
 
 
 class FlowExtractor:
@@ -12,14 +26,38 @@ class FlowExtractor:
         """Run the CICFlowMeter command."""
         self.logger.info(f"Starting flow extraction for: {pcap_path}")
         try:
-            cmd = [
-                "cicflowmeter",
-                "-f", str(pcap_path),
-                "-c",
-                str(output_path)
-            ]
-            subprocess.run(cmd, check=True)
+            _run_cicflowmeter(pcap_path, output_path)
             self.logger.info(f"Flow features saved to {output_path}")
         except subprocess.CalledProcessError as e:
             self.logger.error(f"Error running cicflowmeter: {e}")
             raise
+
+    def extract_many(self, pcap_paths: List[Path], output_dir: Path,
+                     n_workers: Optional[int] = None) -> List[Path]:
+        """
+        Extract flows from many PCAPs in parallel.
+
+        Each pcap gets its own cicflowmeter subprocess, launched from a worker
+        pool, so a directory of captures no longer serializes on one file at a
+        time. Output CSVs are named <pcap stem>_flows.csv inside output_dir.
+        """
+        output_dir = Path(output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        self.logger.info(f"Starting parallel flow extraction for {len(pcap_paths)} pcaps")
+
+        results: List[Path] = []
+        with ProcessPoolExecutor(max_workers=n_workers) as pool:
+            futures = {
+                pool.submit(_run_cicflowmeter, Path(p), output_dir / f"{Path(p).stem}_flows.csv"): p
+                for p in pcap_paths
+            }
+            for future in as_completed(futures):
+                pcap_path = futures[future]
+                try:
+                    output_path = future.result()
+                except subprocess.CalledProcessError as e:
+                    self.logger.error(f"Error running cicflowmeter on {pcap_path}: {e}")
+                    raise
+                self.logger.info(f"Flow features saved to {output_path}")
+                results.append(output_path)
+        return results
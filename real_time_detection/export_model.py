@@ -0,0 +1,80 @@
+"""
+export_model.py
+
+One-off exporter: convert the joblib-pickled sklearn artifacts into compact
+.npz files holding only the arrays inference actually needs.
+
+Unpickling the full LogisticRegression/DecisionTreeClassifier drags the whole
+sklearn import graph into the detector's cold start just to end up doing a
+dot product and a tree walk. The compact files let predictor.py run from
+NumPy alone:
+
+- lr_compact.npz: coef, intercept (binary LR) plus the MinMaxScaler's
+  scale and min_ for the 20 selected features.
+- dt_compact.npz: children_left, children_right, feature, threshold and the
+  per-leaf class-1 probability of the decision tree.
+
+Run once after training (and re-run whenever the joblib artifacts change):
+
+    python3 export_model.py --models_dir models
+"""
+
+import argparse
+import os
+
+import joblib
+import numpy as np
+
+
+def export(models_dir: str):
+    """Write lr_compact.npz and dt_compact.npz next to the joblib artifacts."""
+    model_lr = joblib.load(os.path.join(models_dir, 'logistic_regression_model.joblib'))
+    model_dt = joblib.load(os.path.join(models_dir, 'decision_tree_model.joblib'))
+
+    if model_lr.coef_.shape[0] != 1:
+        raise ValueError(
+            f"Expected a binary LogisticRegression (coef_.shape[0] == 1), "
+            f"got shape {model_lr.coef_.shape}")
+
+    lr_arrays = {
+        'coef': model_lr.coef_[0].astype(np.float32),
+        'intercept': np.float32(model_lr.intercept_[0]),
+    }
+    # scaler_selected is optional, mirroring Predictor: without it the
+    # detector assumes features arrive already scaled.
+    scaler_path = os.path.join(models_dir, 'scaler_selected.joblib')
+    if os.path.exists(scaler_path):
+        scaler = joblib.load(scaler_path)
+        lr_arrays['scale'] = scaler.scale_.astype(np.float32)
+        lr_arrays['min_'] = scaler.min_.astype(np.float32)
+
+    lr_path = os.path.join(models_dir, 'lr_compact.npz')
+    np.savez(lr_path, **lr_arrays)
+    print(f"Wrote {lr_path}")
+
+    tree = model_dt.tree_
+    if tree.value.shape[-1] != 2:
+        raise ValueError(
+            f"Expected a binary DecisionTreeClassifier, "
+            f"got value shape {tree.value.shape}")
+    counts = tree.value[:, 0, :]
+    denom = counts.sum(axis=1)
+    denom[denom == 0] = 1.0
+
+    dt_path = os.path.join(models_dir, 'dt_compact.npz')
+    np.savez(
+        dt_path,
+        children_left=tree.children_left.astype(np.intp),
+        children_right=tree.children_right.astype(np.intp),
+        feature=tree.feature.astype(np.intp),
+        threshold=tree.threshold.astype(np.float32),
+        leaf_value=(counts[:, 1] / denom).astype(np.float32),
+    )
+    print(f"Wrote {dt_path}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export compact .npz model artifacts")
+    parser.add_argument("--models_dir", default="models", help="Path to joblib models")
+    args = parser.parse_args()
+    export(args.models_dir)
@@ -8,78 +8,221 @@ Enhancements:
 - Used by main.py to perform continuous (live) predictions.
 """
 
+import math
 import time
-from collections import defaultdict
-from typing import Dict, Tuple, Any, List
+from collections import OrderedDict
+from socket import inet_aton
+from typing import Dict, Tuple, Any, List, Union
 
 FlowKey = Tuple[str, str, str, str, str]  # normalized 5-tuple
 
+# Memoized decode of raw TCP-flag strings into (SYN, PSH, URG, FIN, RST, ACK)
+# increments. Captures repeat a handful of distinct flag values ('0x0010',
+# '0x0018', ...), so each one is int-parsed and bit-tested once; after that a
+# packet costs a single dict lookup with no data-dependent branches.
+_FLAG_DECODE: Dict[str, Tuple[int, int, int, int, int, int]] = {}
+
+
+def _decode_flags(raw: str) -> Tuple[int, int, int, int, int, int]:
+    """Decode a raw flags string into per-flag 0/1 increments (cached)."""
+    counts = _FLAG_DECODE.get(raw)
+    if counts is None:
+        try:
+            f = int(raw, 0)
+        except Exception:
+            f = 0
+        counts = _FLAG_DECODE[raw] = (
+            (f >> 1) & 1,  # SYN 0x002
+            (f >> 3) & 1,  # PSH 0x008
+            (f >> 5) & 1,  # URG 0x020
+            f & 1,         # FIN 0x001
+            (f >> 2) & 1,  # RST 0x004
+            (f >> 4) & 1,  # ACK 0x010
+        )
+    return counts
+
+
+class _DirStats:
+    """Online (Welford) packet-size and inter-arrival stats for one direction."""
+
+    __slots__ = ('n', 'sum', 'min', 'max', 'mean', 'm2',
+                 'last_ts', 'iat_n', 'iat_sum', 'iat_sumsq', 'iat_max')
+
+    def __init__(self):
+        self.n = 0
+        self.sum = 0
+        self.min = 0
+        self.max = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.last_ts = 0.0
+        self.iat_n = 0
+        self.iat_sum = 0.0
+        self.iat_sumsq = 0.0
+        self.iat_max = 0.0
+
+    def update(self, pkt_len: int, ts: float):
+        """Fold one packet of this direction into the accumulators."""
+        self.n += 1
+        self.sum += pkt_len
+        delta = pkt_len - self.mean
+        self.mean += delta / self.n
+        self.m2 += delta * (pkt_len - self.mean)
+        if self.n == 1:
+            self.min = pkt_len
+            self.max = pkt_len
+        else:
+            self.min = min(self.min, pkt_len)
+            self.max = max(self.max, pkt_len)
+            iat = ts - self.last_ts
+            self.iat_n += 1
+            self.iat_sum += iat
+            self.iat_sumsq += iat * iat
+            self.iat_max = max(self.iat_max, iat)
+        self.last_ts = ts
+
+    def iat_std(self) -> float:
+        """Std of inter-arrival times in this direction."""
+        if not self.iat_n:
+            return 0.0
+        var = self.iat_sumsq / self.iat_n - (self.iat_sum / self.iat_n) ** 2
+        return math.sqrt(var) if var > 0.0 else 0.0
+
 
 class FlowState:
-    """Track packets and compute statistics for a single flow."""
+    """
+    Track packets and compute statistics for a single flow.
+
+    Statistics are kept as online (Welford) accumulators so that both
+    add_packet() and summarize() are O(1) and memory per flow stays constant
+    regardless of how many packets the flow carries.
+
+    The flow is bidirectional: the (src, srcport) of the first packet is
+    recorded as the origin and every later packet is routed into forward
+    (origin -> responder) or backward accumulators by comparing against it.
+    """
+
+    __slots__ = ('key_tuple', 'first_ts', 'last_ts', 'origin', 'dest_port', 'pkts',
+                 'total_bytes', 'fwd', 'bwd', 'pkt_min', 'pkt_max', 'pkt_mean',
+                 'pkt_m2', 'iat_n', 'iat_sum', 'last_pkt_ts',
+                 'syn', 'psh', 'urg', 'fin', 'rst', 'ack')
 
-    def __init__(self, first_ts: float):
+    def __init__(self, first_ts: float, origin: Tuple[str, str] = ('', ''),
+                 dest_port: str = '0', key_tuple: FlowKey = ('', '', '', '', '')):
+        self.key_tuple = key_tuple
         self.first_ts = first_ts
         self.last_ts = first_ts
+        self.origin = origin
+        try:
+            self.dest_port = float(dest_port)
+        except (TypeError, ValueError):
+            self.dest_port = 0.0
         self.pkts = 0
         self.total_bytes = 0
-        self.packet_sizes: List[int] = []
-        self.inter_arrivals: List[float] = []
+        self.fwd = _DirStats()
+        self.bwd = _DirStats()
+        # Online packet-size stats (Welford)
+        self.pkt_min = 0
+        self.pkt_max = 0
+        self.pkt_mean = 0.0
+        self.pkt_m2 = 0.0
+        # Online inter-arrival stats
+        self.iat_n = 0
+        self.iat_sum = 0.0
         self.last_pkt_ts = first_ts
-        self.tcp_flags = defaultdict(int)
+        # TCP flag counters as plain ints (no dict lookup per packet)
+        self.syn = 0
+        self.psh = 0
+        self.urg = 0
+        self.fin = 0
+        self.rst = 0
+        self.ack = 0
 
-    def add_packet(self, pkt_len: int, ts: float, tcp_flags_raw: str | None):
-        """Add packet info and update statistics."""
+    def add_packet(self, pkt_len: int, ts: float, tcp_flags_raw: str | None,
+                   src: str = '', srcp: str = ''):
+        """Add packet info and update running statistics (overall + per-direction)."""
         self.pkts += 1
         self.total_bytes += pkt_len
-        self.packet_sizes.append(pkt_len)
-        if self.pkts > 1:
-            self.inter_arrivals.append(ts - self.last_pkt_ts)
+
+        # Route into the directional accumulators
+        if (src, srcp) == self.origin:
+            self.fwd.update(pkt_len, ts)
+        else:
+            self.bwd.update(pkt_len, ts)
+
+        # Welford update for packet sizes
+        delta = pkt_len - self.pkt_mean
+        self.pkt_mean += delta / self.pkts
+        self.pkt_m2 += delta * (pkt_len - self.pkt_mean)
+        if self.pkts == 1:
+            self.pkt_min = pkt_len
+            self.pkt_max = pkt_len
+        else:
+            self.pkt_min = min(self.pkt_min, pkt_len)
+            self.pkt_max = max(self.pkt_max, pkt_len)
+            # Inter-arrival time (only defined from the second packet on)
+            self.iat_n += 1
+            self.iat_sum += ts - self.last_pkt_ts
         self.last_pkt_ts = ts
         self.last_ts = ts
 
         if tcp_flags_raw:
-            try:
-                flags_int = int(tcp_flags_raw, 0)
-                if flags_int & 0x002:
-                    self.tcp_flags['SYN'] += 1
-                if flags_int & 0x008:
-                    self.tcp_flags['PSH'] += 1
-                if flags_int & 0x020:
-                    self.tcp_flags['URG'] += 1
-                if flags_int & 0x001:
-                    self.tcp_flags['FIN'] += 1
-                if flags_int & 0x004:
-                    self.tcp_flags['RST'] += 1
-                if flags_int & 0x010:
-                    self.tcp_flags['ACK'] += 1
-            except Exception:
-                pass
+            syn, psh, urg, fin, rst, ack = _decode_flags(tcp_flags_raw)
+            self.syn += syn
+            self.psh += psh
+            self.urg += urg
+            self.fin += fin
+            self.rst += rst
+            self.ack += ack
 
     def summarize(self) -> Dict[str, Any]:
-        """Return statistical summary of this flow."""
-        import numpy as np
+        """Return statistical summary of this flow (O(1) — reads accumulators only)."""
         duration = max(1e-6, self.last_ts - self.first_ts)
-        pkt_mean = float(np.mean(self.packet_sizes)) if self.packet_sizes else 0.0
-        pkt_std = float(np.std(self.packet_sizes)) if self.packet_sizes else 0.0
-        pkt_var = float(np.var(self.packet_sizes)) if self.packet_sizes else 0.0
-        avg_pkt_size = float(sum(self.packet_sizes) / len(self.packet_sizes)) if self.packet_sizes else 0.0
-        avg_inter = float(np.mean(self.inter_arrivals)) if self.inter_arrivals else 0.0
-        max_pkt = int(max(self.packet_sizes)) if self.packet_sizes else 0
-        min_pkt = int(min(self.packet_sizes)) if self.packet_sizes else 0
+        if self.pkts:
+            pkt_mean = self.pkt_mean
+            pkt_var = self.pkt_m2 / self.pkts
+            pkt_std = math.sqrt(pkt_var)
+            avg_pkt_size = self.total_bytes / self.pkts
+        else:
+            pkt_mean = pkt_var = pkt_std = avg_pkt_size = 0.0
+        avg_inter = self.iat_sum / self.iat_n if self.iat_n else 0.0
+        max_pkt = self.pkt_max
+        min_pkt = self.pkt_min
+
+        fwd, bwd = self.fwd, self.bwd
+        bwd_var = bwd.m2 / bwd.n if bwd.n else 0.0
 
         return {
             'duration': duration,
             'pkts': self.pkts,
             'total_bytes': self.total_bytes,
+            'dest_port': self.dest_port,
             'avg_pkt_size': avg_pkt_size,
             'pkt_std': pkt_std,
             'pkt_mean': pkt_mean,
             'pkt_var': pkt_var,
             'avg_inter': avg_inter,
-            'max_pkt': max_pkt,
-            'min_pkt': min_pkt,
-            'tcp_flags': dict(self.tcp_flags)
+            'max_pkt': float(max_pkt),
+            'min_pkt': float(min_pkt),
+            # Forward (origin -> responder) direction
+            'fwd_pkt_max': float(fwd.max),
+            'fwd_pkt_min': float(fwd.min),
+            'fwd_pkt_mean': fwd.mean,
+            'fwd_iat_std': fwd.iat_std(),
+            'avg_fwd_seg': fwd.sum / fwd.n if fwd.n else 0.0,
+            # Backward (responder -> origin) direction
+            'bwd_pkt_max': float(bwd.max),
+            'bwd_pkt_min': float(bwd.min),
+            'bwd_pkt_mean': bwd.mean,
+            'bwd_pkt_std': math.sqrt(bwd_var) if bwd_var > 0.0 else 0.0,
+            'bwd_iat_total': bwd.iat_sum,
+            'bwd_iat_max': bwd.iat_max,
+            'avg_bwd_seg': bwd.sum / bwd.n if bwd.n else 0.0,
+            # Flag counts
+            'psh_count': float(self.psh),
+            'urg_count': float(self.urg),
+            'tcp_flags': {'SYN': self.syn, 'PSH': self.psh, 'URG': self.urg,
+                          'FIN': self.fin, 'RST': self.rst, 'ACK': self.ack}
         }
 
     def is_inactive(self, now: float, timeout: float) -> bool:
@@ -95,7 +238,12 @@ class FlowAggregator:
 
     def __init__(self, timeout: float = 30.0):
         self.timeout = timeout
-        self.flows: Dict[FlowKey, FlowState] = {}
+        # Kept ordered by last activity (LRU): the least recently updated
+        # flow is always at the front, so expiry scans stop at the first
+        # still-active flow instead of walking the whole table.
+        # Keys are packed ints for IPv4 flows (tuple fallback otherwise);
+        # the human-readable 5-tuple lives on FlowState.key_tuple.
+        self.flows: 'OrderedDict[Union[int, FlowKey], FlowState]' = OrderedDict()
 
     @staticmethod
     def _normalize_key(src: str, dst: str, srcp: str, dstp: str, proto: str) -> FlowKey:
@@ -104,13 +252,36 @@ class FlowAggregator:
             return (src, dst, srcp, dstp, proto)
         return (dst, src, dstp, srcp, proto)
 
-    def add_packet(self, pkt_tuple: tuple):
-        """Update flow with a new packet."""
-        import time
+    @staticmethod
+    def _pack_key(key: FlowKey) -> Union[int, FlowKey]:
+        """
+        Pack a normalized IPv4 flow key into one int (u32 ip, u32 ip, u16
+        port, u16 port, u8 proto), so dict lookups hash a single small int
+        instead of five strings. Falls back to the tuple itself for non-IPv4
+        or malformed fields.
+        """
+        src, dst, srcp, dstp, proto = key
+        try:
+            return int.from_bytes(
+                inet_aton(src) + inet_aton(dst)
+                + int(srcp).to_bytes(2, 'big') + int(dstp).to_bytes(2, 'big')
+                + int(proto).to_bytes(1, 'big'), 'big')
+        except (OSError, ValueError, OverflowError):
+            return key
+
+    def add_packet(self, pkt_tuple: tuple, now: float | None = None):
+        """
+        Update flow with a new packet.
+
+        Args:
+            pkt_tuple: parsed packet fields (TSHARK_FIELDS order)
+            now: wallclock sampled by the caller; passing it avoids a
+                time.time() call per packet when the tuple has no timestamp
+        """
         try:
-            ts = float(pkt_tuple[0]) if pkt_tuple[0] else time.time()
+            ts = float(pkt_tuple[0]) if pkt_tuple[0] else (now or time.time())
         except Exception:
-            ts = time.time()
+            ts = now or time.time()
 
         src, dst = pkt_tuple[1], pkt_tuple[2]
         tcp_src, tcp_dst = pkt_tuple[3], pkt_tuple[4]
@@ -125,32 +296,49 @@ class FlowAggregator:
         srcp = tcp_src or udp_src or '0'
         dstp = tcp_dst or udp_dst or '0'
 
-        key = self._normalize_key(src, dst, srcp, dstp, proto)
-        if key not in self.flows:
-            self.flows[key] = FlowState(first_ts=ts)
-        self.flows[key].add_packet(flen, ts, tcp_flags)
+        key_tuple = self._normalize_key(src, dst, srcp, dstp, proto)
+        key = self._pack_key(key_tuple)
+        # Get-or-insert with a single hash/lookup of the key
+        state = self.flows.get(key)
+        if state is None:
+            state = self.flows[key] = FlowState(first_ts=ts, origin=(src, srcp),
+                                                dest_port=dstp, key_tuple=key_tuple)
+        else:
+            self.flows.move_to_end(key)
+        state.add_packet(flen, ts, tcp_flags, src, srcp)
 
     def summarize_active_flows(self) -> List[Tuple[FlowKey, Dict[str, Any]]]:
         """
         Return summaries for all currently active flows (for continuous prediction).
         """
-        return [(k, f.summarize()) for k, f in self.flows.items()]
+        return [(f.key_tuple, f.summarize()) for f in self.flows.values()]
 
-    def collect_inactive_flows(self) -> List[Tuple[FlowKey, Dict[str, Any]]]:
-        """Return and remove timed-out flows."""
-        now = time.time()
+    def collect_inactive_flows(self, now: float | None = None) -> List[Tuple[FlowKey, Dict[str, Any]]]:
+        """
+        Return and remove timed-out flows.
+
+        Flows are ordered by last activity, so the scan walks only the expired
+        prefix and stops at the first still-active flow — O(expired), not
+        O(active), and no copy of the whole table per call.
+
+        Args:
+            now: wallclock sampled by the caller (defaults to time.time())
+        """
+        if now is None:
+            now = time.time()
         expired = []
         result = []
-        for k, f in list(self.flows.items()):
-            if f.is_inactive(now, self.timeout):
-                result.append((k, f.summarize()))
-                expired.append(k)
+        for k, f in self.flows.items():
+            if not f.is_inactive(now, self.timeout):
+                break
+            result.append((f.key_tuple, f.summarize()))
+            expired.append(k)
         for k in expired:
             del self.flows[k]
         return result
 
     def flush_all(self) -> List[Tuple[FlowKey, Dict[str, Any]]]:
         """Force flush all flows."""
-        result = [(k, f.summarize()) for k, f in self.flows.items()]
+        result = [(f.key_tuple, f.summarize()) for f in self.flows.values()]
         self.flows.clear()
         return result
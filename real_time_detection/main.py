@@ -3,12 +3,38 @@ import csv
 import os
 import sys
 import time
-from tshark_runner import stream_packets
+import numpy as np
+import af_packet_runner
+from tshark_runner import stream_packets_pcap
 from flow_aggregator import FlowAggregator
 from feature_extractor import extract_features
 from predictor import Predictor
 from xdp_filter_manager import XDPManager
 
+# Prediction cadence: flows are scored when they go inactive, plus a
+# periodic sweep over still-active flows every N packets or T seconds.
+SWEEP_EVERY_PKTS = 2000
+SWEEP_INTERVAL = 5.0
+
+# Flows per model-inference batch (rows of the preallocated feature matrix)
+BATCH_SIZE = 256
+
+# CSV rows are buffered and written out in bulk at this count/age
+ROW_BUF_MAX = 512
+ROW_FLUSH_INTERVAL = 1.0
+
+# Wallclock string for CSV rows, re-rendered only when the second changes
+_ts_cache = [0, '']
+
+
+def _timestamp() -> str:
+    """Return the current 'YYYY-mm-dd HH:MM:SS' string, cached per second."""
+    now = int(time.time())
+    if now != _ts_cache[0]:
+        _ts_cache[0] = now
+        _ts_cache[1] = time.strftime("%Y-%m-%d %H:%M:%S")
+    return _ts_cache[1]
+
 
 def run(iface: str, models_dir: str, timeout: float, threshold: float, duration: float):
     """Run continuous prediction pipeline with CSV logging and XDP mitigation."""
@@ -48,137 +74,127 @@ def run(iface: str, models_dir: str, timeout: float, threshold: float, duration:
     ]
 
     new_file = not os.path.exists(log_file) or os.path.getsize(log_file) == 0
-    csv_file = open(log_file, "a", newline="")
+    csv_file = open(log_file, "a", newline="", buffering=1 << 20)
     writer = csv.writer(csv_file)
     if new_file:
         writer.writerow(header)
 
+    # Rows are buffered here and flushed in bulk — one write() per batch of
+    # rows instead of a write+flush syscall pair per row.
+    row_buf: list = []
+    last_flush = time.monotonic()
+
+    def flush_rows():
+        nonlocal last_flush
+        if row_buf:
+            writer.writerows(row_buf)
+            row_buf.clear()
+        csv_file.flush()
+        last_flush = time.monotonic()
+
+    # Prefer the raw AF_PACKET capture path (no tshark subprocess, no text
+    # round-trip per packet); fall back to tshark's binary pcap stream where
+    # AF_PACKET is unavailable.
+    if af_packet_runner.is_supported():
+        packet_source = af_packet_runner.stream_packets
+    else:
+        print("[!] AF_PACKET capture unavailable, falling back to tshark (pcap mode).")
+        packet_source = stream_packets_pcap
+
     print(f"[+] Capturing on {iface} for up to {duration} seconds (real-time predictions and XDP mitigation)...")
 
-    try:
-        for pkt in stream_packets(iface, duration):
-            agg.add_packet(pkt)
+    # Preallocated feature matrix reused for every inference batch
+    pending_X = np.empty((BATCH_SIZE, len(feature_names)), dtype=np.float32)
 
-            # Summarize active flows
-            for key, summary in agg.summarize_active_flows():
-                fv = extract_features(key, summary)
-                res = pred.predict(fv, threshold=threshold)
+    # Source IPs already handed to XDP — each offender costs one map update
+    # instead of one syscall per sweep it stays malicious
+    blocked: set = set()
 
+    def emit(flows):
+        """
+        Score a list of (key, summary) pairs in batches, mitigate and log.
+
+        The single hot code path shared by the live loop, the end-of-capture
+        flush and the interrupt flush.
+        """
+        for start in range(0, len(flows), BATCH_SIZE):
+            batch = flows[start:start + BATCH_SIZE]
+            n = len(batch)
+
+            # Fill the preallocated matrix row by row
+            for i, (key, summary) in enumerate(batch):
+                pending_X[i] = extract_features(key, summary)
+
+            # One vectorized inference per batch instead of one per flow
+            lr_proba, lr_labels, dt_proba, dt_labels = pred.predict_batch(
+                pending_X[:n], threshold=threshold)
+
+            rows = []
+            ts_str = _timestamp()
+            for i, (key, summary) in enumerate(batch):
                 src, dst, srcp, dstp, proto = key
-                lr_is_mal = res['lr_label'] == 1
-                dt_is_mal = res['dt_label'] == 1
-                
+
                 # Determine final label based on *any* model flagging it
-                label = "MALICIOUS" if (lr_is_mal or dt_is_mal) else "BENIGN"
+                label = "MALICIOUS" if (lr_labels[i] or dt_labels[i]) else "BENIGN"
 
                 # --- XDP MITIGATION LOGIC ---
-                if label == "MALICIOUS":
-                    # Block the source IP (the attacker)
-                    xdp_manager.block_ip(src) 
+                if label == "MALICIOUS" and src not in blocked:
+                    # Block the source IP (the attacker) — once per offender
+                    xdp_manager.block_ip(src)
+                    blocked.add(src)
                 # ----------------------------
 
                 # Print prediction
                 print(f"[{label}] {src}:{srcp} → {dst}:{dstp} | "
-                      f"LR={res['lr_proba']:.3f} DT={res['dt_proba']:.3f}")
+                      f"LR={lr_proba[i]:.3f} DT={dt_proba[i]:.3f}")
 
                 # --- Build CSV row ---
                 row = [
-                    time.strftime("%Y-%m-%d %H:%M:%S"),
+                    ts_str,
                     src, dst, srcp, dstp, proto
                 ]
-
-                # --- Append features safely ---
-                if isinstance(fv, dict):
-                    for feat in feature_names:
-                        row.append(fv.get(feat, 0.0))
-                elif isinstance(fv, (list, tuple)):
-                    row.extend(fv)
-                else:
-                    # fallback if unknown type
-                    row.extend([0.0] * len(feature_names))
-
-                # Append predictions
+                row.extend(float(x) for x in pending_X[i])
                 row += [
-                    res['lr_proba'], res['dt_proba'],
-                    res['lr_label'], res['dt_label'], label
+                    float(lr_proba[i]), float(dt_proba[i]),
+                    int(lr_labels[i]), int(dt_labels[i]), label
                 ]
+                rows.append(row)
 
-                writer.writerow(row)
-                csv_file.flush()
+            row_buf.extend(rows)
+            if len(row_buf) >= ROW_BUF_MAX or time.monotonic() - last_flush > ROW_FLUSH_INTERVAL:
+                flush_rows()
 
-            agg.collect_inactive_flows()
+    try:
+        pkt_count = 0
+        last_sweep = time.time()
+        for pkt in packet_source(iface, duration):
+            # One wallclock sample per packet, shared by aggregation, expiry
+            # and the sweep check below
+            now = time.time()
+            agg.add_packet(pkt, now)
+            pkt_count += 1
+
+            # Flows that timed out get their (final) prediction now
+            ready = agg.collect_inactive_flows(now)
+
+            # Periodic sweep: re-score flows that are still active
+            if pkt_count % SWEEP_EVERY_PKTS == 0 or now - last_sweep >= SWEEP_INTERVAL:
+                ready.extend(agg.summarize_active_flows())
+                last_sweep = now
+
+            if ready:
+                emit(ready)
 
         # Flush remaining flows at end of capture
         print("\n[+] Duration elapsed, flushing remaining flows...")
-        for key, summary in agg.flush_all():
-            fv = extract_features(key, summary)
-            res = pred.predict(fv, threshold=threshold)
-            src, dst, srcp, dstp, proto = key
-            lr_is_mal = res['lr_label'] == 1
-            dt_is_mal = res['dt_label'] == 1
-            label = "MALICIOUS" if (lr_is_mal or dt_is_mal) else "BENIGN"
-            
-            if label == "MALICIOUS":
-                xdp_manager.block_ip(src) 
-
-            row = [
-                time.strftime("%Y-%m-%d %H:%M:%S"),
-                src, dst, srcp, dstp, proto
-            ]
-
-            if isinstance(fv, dict):
-                for feat in feature_names:
-                    row.append(fv.get(feat, 0.0))
-            elif isinstance(fv, (list, tuple)):
-                row.extend(fv)
-            else:
-                row.extend([0.0] * len(feature_names))
-
-            row += [
-                res['lr_proba'], res['dt_proba'],
-                res['lr_label'], res['dt_label'], label
-            ]
-
-            writer.writerow(row)
-            csv_file.flush()
-            print(f"[{label}] {key}")
+        emit(agg.flush_all())
 
     except KeyboardInterrupt:
         print("[!] Interrupted by user, flushing remaining flows...")
-        for key, summary in agg.flush_all():
-            fv = extract_features(key, summary)
-            res = pred.predict(fv, threshold=threshold)
-            src, dst, srcp, dstp, proto = key
-            lr_is_mal = res['lr_label'] == 1
-            dt_is_mal = res['dt_label'] == 1
-            label = "MALICIOUS" if (lr_is_mal or dt_is_mal) else "BENIGN"
-            
-            if label == "MALICIOUS":
-                xdp_manager.block_ip(src) 
-
-            row = [
-                time.strftime("%Y-%m-%d %H:%M:%S"),
-                src, dst, srcp, dstp, proto
-            ]
-
-            if isinstance(fv, dict):
-                for feat in feature_names:
-                    row.append(fv.get(feat, 0.0))
-            elif isinstance(fv, (list, tuple)):
-                row.extend(fv)
-            else:
-                row.extend([0.0] * len(feature_names))
-
-            row += [
-                res['lr_proba'], res['dt_proba'],
-                res['lr_label'], res['dt_label'], label
-            ]
-
-            writer.writerow(row)
-            csv_file.flush()
-            print(f"[{label}] {key}")
+        emit(agg.flush_all())
 
     finally:
+        flush_rows()
         csv_file.close()
         # Unload XDP filter on exit
         xdp_manager.unload_xdp_filter() 
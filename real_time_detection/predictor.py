@@ -5,16 +5,52 @@ Load preprocessing artifacts and ML models saved with joblib and expose a Predic
 class with a predict_proba(feature_vector) method that returns model probabilities.
 
 Expectations:
-- The preferred artifact is 'models/scaler_selected.joblib' (MinMaxScaler fitted on
-  the 20 selected features). If present, Predictor will scale the 20-D vector
-  directly.
-- Models required: 'logistic_regression_model.joblib' and 'decision_tree_model.joblib'.
+- Preferred artifacts are 'models/lr_compact.npz' and 'models/dt_compact.npz'
+  (written by export_model.py): raw parameter arrays that let inference run
+  from NumPy alone, with no joblib/sklearn import at startup.
+- Fallback: 'scaler_selected.joblib' (MinMaxScaler fitted on the 20 selected
+  features) plus 'logistic_regression_model.joblib' and
+  'decision_tree_model.joblib', loaded via joblib.
+- Artifacts should be dumped uncompressed (joblib.dump(..., compress=0)) so their
+  ndarray buffers are mmap-eligible; compressed files still load, just privately.
 """
 
+import collections
 import os
-import joblib
 import numpy as np
-from typing import List, Dict
+from typing import List, Tuple
+
+# joblib (and with it the sklearn unpickling machinery) is imported lazily in
+# Predictor.__init__, only when the compact .npz artifacts are absent.
+
+
+# Rows the reusable per-batch buffers start at (grown on demand)
+MAX_BATCH = 1024
+
+# Single-flow prediction result: a namedtuple instead of a four-key dict —
+# one tuple allocation per call and attribute access instead of hashing
+PredResult = collections.namedtuple('PredResult', 'lr_proba lr_label dt_proba dt_label')
+
+
+def _tree_proba_batch(X: np.ndarray, left: np.ndarray, right: np.ndarray,
+                      feature: np.ndarray, threshold: np.ndarray,
+                      leaf_val: np.ndarray) -> np.ndarray:
+    """
+    Walk a decision tree for all rows of X at once.
+
+    All rows descend level by level: at each step the still-internal rows
+    compare their split feature against the node threshold and move to the
+    left or right child in one vectorized operation (sklearn marks leaves
+    with child index -1). Returns the class-1 probability per row.
+    """
+    node = np.zeros(X.shape[0], dtype=np.intp)
+    active = np.nonzero(left[node] >= 0)[0]
+    while active.size:
+        nd = node[active]
+        go_left = X[active, feature[nd]] <= threshold[nd]
+        node[active] = np.where(go_left, left[nd], right[nd])
+        active = active[left[node[active]] >= 0]
+    return leaf_val[node]
 
 
 class Predictor:
@@ -30,66 +66,256 @@ class Predictor:
         self.scaler_selected = None  # scaler fitted on the 20 selected features
         self.model_lr = None
         self.model_dt = None
+        self._scale = None
+        self._min = None
+        self._scaled_buf = None
+        self._lr_w = None
+        self._lr_b = 0.0
+        self._dt_value = None
+
+        # Preferred artifacts: the compact .npz files written by
+        # export_model.py, holding only the arrays inference needs. Loading
+        # them keeps joblib and the entire sklearn import graph (~500 ms of
+        # cold start) out of the process; the pickled estimators remain as
+        # the fallback for models that were never exported.
+        lr_npz = os.path.join(models_dir, 'lr_compact.npz')
+        dt_npz = os.path.join(models_dir, 'dt_compact.npz')
+        if os.path.exists(lr_npz) and os.path.exists(dt_npz):
+            with np.load(lr_npz) as lr:
+                self._lr_w = lr['coef'].astype(np.float32, copy=False)
+                self._lr_b = float(lr['intercept'])
+                if 'scale' in lr:  # scaler_selected is optional
+                    self._scale = lr['scale'].astype(np.float32, copy=False)
+                    self._min = lr['min_'].astype(np.float32, copy=False)
+            with np.load(dt_npz) as dt:
+                self._dt_left = dt['children_left'].astype(np.intp, copy=False)
+                self._dt_right = dt['children_right'].astype(np.intp, copy=False)
+                self._dt_feature = dt['feature'].astype(np.intp, copy=False)
+                self._dt_threshold = dt['threshold'].astype(np.float32, copy=False)
+                self._dt_value = dt['leaf_value'].astype(np.float32, copy=False)
+            if self._scale is not None:
+                self._scaled_buf = np.empty((MAX_BATCH, self._scale.size), dtype=np.float32)
+        else:
+            self._load_joblib(models_dir)
+
+        # Early-exit bookkeeping: how many rows skipped vs. ran the tree,
+        # so ops can tune the thresholds against observed miss rates.
+        self.dt_evaluated = 0
+        self.dt_skipped = 0
+
+        # Reusable int8 label buffers: np.greater_equal writes straight into
+        # them, fusing the compare and the bool->int8 cast without allocating
+        # an intermediate per batch.
+        self._lr_label_buf = np.empty(MAX_BATCH, dtype=np.int8)
+        self._dt_label_buf = np.empty(MAX_BATCH, dtype=np.int8)
 
-        # Try to load scaler_selected
+        # Warm the inference path once at construction: the first call
+        # otherwise pays one-off costs (lazy sklearn/NumPy imports, ufunc
+        # setup, faulting in the mmapped parameter pages) right when the
+        # first live flow needs a decision. A dummy batch moves that cost
+        # to startup so latency-to-first-decision is just the arithmetic.
+        if self._lr_w is not None:
+            n_features = self._lr_w.size
+        elif self._scale is not None:
+            n_features = self._scale.size
+        else:
+            n_features = getattr(self.model_lr, 'n_features_in_', 20)
+        self.predict_batch(np.zeros((1, n_features), dtype=np.float32))
+
+    def _load_joblib(self, models_dir: str):
+        """Fallback loader: unpickle the sklearn estimators via joblib."""
+        import joblib
+
+        # Try to load scaler_selected. mmap_mode='r' maps the ndarray buffers
+        # from the file instead of deserializing private copies, so workers
+        # forked per interface share one physical copy of the parameters.
         scaler_sel_path = os.path.join(models_dir, 'scaler_selected.joblib')
         if os.path.exists(scaler_sel_path):
-            self.scaler_selected = joblib.load(scaler_sel_path)
+            self.scaler_selected = joblib.load(scaler_sel_path, mmap_mode='r')
 
         # Load models (required)
         lr_path = os.path.join(models_dir, 'logistic_regression_model.joblib')
         dt_path = os.path.join(models_dir, 'decision_tree_model.joblib')
         if not os.path.exists(lr_path) or not os.path.exists(dt_path):
             raise FileNotFoundError(f"Required model files not found in {models_dir}. Expected: {lr_path}, {dt_path}")
-        self.model_lr = joblib.load(lr_path)
-        self.model_dt = joblib.load(dt_path)
+        self.model_lr = joblib.load(lr_path, mmap_mode='r')
+        self.model_dt = joblib.load(dt_path, mmap_mode='r')
+
+        # Inference runs in float32: half the memory traffic of the float64
+        # the artifacts were saved with, and twice the SIMD lanes in the
+        # sklearn inner loops. Cast the loaded parameters once here (ideally
+        # training would dump float32 artifacts and these become no-ops).
+        if self.scaler_selected is not None:
+            for attr in ('scale_', 'min_', 'data_min_', 'data_max_', 'data_range_'):
+                if hasattr(self.scaler_selected, attr):
+                    setattr(self.scaler_selected, attr,
+                            getattr(self.scaler_selected, attr).astype(np.float32, copy=True))
+        if hasattr(self.model_lr, 'coef_'):
+            self.model_lr.coef_ = self.model_lr.coef_.astype(np.float32, copy=True)
+            self.model_lr.intercept_ = self.model_lr.intercept_.astype(np.float32, copy=True)
+
+        # MinMaxScaler.transform on a small batch is dominated by sklearn
+        # validation, not arithmetic. Cache scale_/min_ once and apply the
+        # transform as x * scale + min into a reusable output buffer.
+        if self.scaler_selected is not None:
+            self._scale = self.scaler_selected.scale_
+            self._min = self.scaler_selected.min_
+            self._scaled_buf = np.empty((MAX_BATCH, self._scale.size), dtype=np.float32)
+
+        # Binary logistic regression is just sigmoid(X @ w + b); cache the
+        # parameters once so the hot path is a dot product instead of
+        # predict_proba with its per-call input validation. Multi-class
+        # models (coef_.shape[0] > 1) keep the sklearn path.
+        if hasattr(self.model_lr, 'coef_') and self.model_lr.coef_.shape[0] == 1:
+            self._lr_w = self.model_lr.coef_[0]
+            self._lr_b = float(self.model_lr.intercept_[0])
+
+        # Decision-tree inference from the raw tree arrays: cache the
+        # children/feature/threshold arrays and per-leaf class-1 probability
+        # once, so batches are scored by _tree_proba_batch without sklearn's
+        # per-call attribute lookups and validation.
+        if hasattr(self.model_dt, 'tree_') and self.model_dt.tree_.value.shape[-1] == 2:
+            t = self.model_dt.tree_
+            self._dt_left = t.children_left.copy()
+            self._dt_right = t.children_right.copy()
+            self._dt_feature = t.feature.copy()
+            self._dt_threshold = t.threshold.astype(np.float32, copy=True)
+            counts = t.value[:, 0, :]
+            denom = counts.sum(axis=1)
+            denom[denom == 0] = 1.0
+            self._dt_value = (counts[:, 1] / denom).astype(np.float32)
 
-    def _preprocess(self, fv: List[float]) -> np.ndarray:
+    def _preprocess(self, fvs) -> np.ndarray:
         """
-        Preprocess 20-D feature vector for prediction.
+        Preprocess feature vectors (one 20-D vector or an (N, 20) batch).
 
         Returns:
-            numpy array shaped (1, n_features_expected_by_models)
+            numpy array shaped (N, n_features_expected_by_models). The result
+            may be a view into an internal buffer, valid until the next call.
         """
-        x = np.array(fv, dtype=float).reshape(1, -1)
-        if self.scaler_selected is not None:
-            x_scaled = self.scaler_selected.transform(x)
-            return x_scaled
-        else:
-            # If no scaler_selected is provided, assume raw features are already scaled/compatible.
-            # This is less safe — prefer saving scaler_selected during training.
-            return x
+        x = np.ascontiguousarray(fvs, dtype=np.float32)
+        if x.ndim == 1:
+            x = x.reshape(1, -1)
+        if self._scale is not None:
+            n = x.shape[0]
+            if self._scaled_buf.shape[0] < n:
+                self._scaled_buf = np.empty((n, self._scale.size), dtype=np.float32)
+            out = self._scaled_buf[:n]
+            np.multiply(x, self._scale, out=out)
+            np.add(out, self._min, out=out)
+            return out
+        # If no scaler_selected is provided, assume raw features are already
+        # scaled/compatible. This is less safe — prefer saving scaler_selected
+        # during training.
+        return x
 
-    def predict(self, fv: List[float], threshold: float = 0.5) -> Dict[str, object]:
+    def predict_proba_batch(self, X: np.ndarray,
+                            early_exit_low: float = 0.05,
+                            early_exit_high: float = 0.95
+                            ) -> Tuple[np.ndarray, np.ndarray]:
         """
-        Predict probabilities and labels from both models.
+        Predict class-1 probabilities for a whole batch of feature vectors.
+
+        Scaling and model inference each run once over the full matrix, so the
+        per-sample Python overhead is paid once per batch instead of per flow.
+
+        The logistic regression (a dot product) runs first on every row; the
+        decision tree is only walked for rows where LR is undecided, i.e.
+        early_exit_low <= lr_proba < early_exit_high. Confidently benign rows
+        need no second opinion, and confidently malicious rows are already
+        flagged since the final label ORs the two models. Skipped rows get
+        dt_proba 0.0. On steady-state benign traffic this skips the tree for
+        nearly every row; pass early_exit_low=0.0, early_exit_high=1.0 to
+        always run both models. The dt_evaluated/dt_skipped counters track
+        how often the tree ran, for tuning the thresholds.
 
         Args:
-            fv: list of 20 floats in the same order as training features.
-            threshold: probability threshold to label as malicious.
+            X: array of shape (N, 20); a C-contiguous float32 array avoids copies.
+            early_exit_low: skip the tree when lr_proba is below this.
+            early_exit_high: skip the tree when lr_proba is at or above this.
 
         Returns:
-            dict with keys:
-              - 'lr_proba', 'lr_label', 'dt_proba', 'dt_label'
+            (lr_proba, dt_proba): two 1-D arrays of shape (N,)
         """
-        x_pre = self._preprocess(fv)
-        # logistic proba (prob of class 1)
-        if hasattr(self.model_lr, 'predict_proba'):
-            lr_proba = float(self.model_lr.predict_proba(x_pre)[:, 1][0])
+        X = self._preprocess(X)
+        if self._lr_w is not None:
+            z = X @ self._lr_w + self._lr_b
+            lr_proba = 1.0 / (1.0 + np.exp(-z))
+        elif hasattr(self.model_lr, 'predict_proba'):
+            lr_proba = self.model_lr.predict_proba(X)[:, 1]
         else:
-            # If model does not implement predict_proba, fallback to predict (0/1)
-            lr_label_only = int(self.model_lr.predict(x_pre)[0])
-            lr_proba = float(lr_label_only)
+            lr_proba = self.model_lr.predict(X).astype(float)
 
-        if hasattr(self.model_dt, 'predict_proba'):
-            dt_proba = float(self.model_dt.predict_proba(x_pre)[:, 1][0])
+        undecided = np.nonzero((lr_proba >= early_exit_low)
+                               & (lr_proba < early_exit_high))[0]
+        self.dt_evaluated += undecided.size
+        self.dt_skipped += lr_proba.size - undecided.size
+        if undecided.size == 0:
+            return lr_proba, np.zeros(lr_proba.size, dtype=np.float32)
+        if undecided.size == lr_proba.size:
+            Xu = X
         else:
-            dt_label_only = int(self.model_dt.predict(x_pre)[0])
-            dt_proba = float(dt_label_only)
-
-        return {
-            'lr_proba': lr_proba,
-            'lr_label': int(lr_proba >= threshold),
-            'dt_proba': dt_proba,
-            'dt_label': int(dt_proba >= threshold)
-        }
+            Xu = X[undecided]
+
+        if self._dt_value is not None:
+            dt_sel = _tree_proba_batch(Xu, self._dt_left, self._dt_right,
+                                       self._dt_feature, self._dt_threshold,
+                                       self._dt_value)
+        elif hasattr(self.model_dt, 'predict_proba'):
+            dt_sel = self.model_dt.predict_proba(Xu)[:, 1]
+        else:
+            dt_sel = self.model_dt.predict(Xu).astype(float)
+
+        if Xu is X:
+            return lr_proba, dt_sel
+        dt_proba = np.zeros(lr_proba.size, dtype=np.float32)
+        dt_proba[undecided] = dt_sel
+        return lr_proba, dt_proba
+
+    def predict_batch(self, fvs: np.ndarray, threshold: float = 0.5,
+                      early_exit_low: float = 0.05, early_exit_high: float = 0.95
+                      ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Predict probabilities and labels for a window of feature vectors.
+
+        Args:
+            fvs: array of shape (N, 20) in training-feature order; a
+                C-contiguous float32 array avoids copies.
+            threshold: probability threshold to label as malicious.
+            early_exit_low/early_exit_high: LR-confidence band outside which
+                the decision tree is skipped (see predict_proba_batch).
+
+        Returns:
+            (lr_proba, lr_labels, dt_proba, dt_labels): 1-D arrays of shape (N,);
+            labels are int8 0/1 views into internal buffers, valid until the
+            next predict_batch/predict call — copy them to retain.
+        """
+        lr_proba, dt_proba = self.predict_proba_batch(
+            fvs, early_exit_low=early_exit_low, early_exit_high=early_exit_high)
+        n = lr_proba.size
+        if self._lr_label_buf.size < n:
+            self._lr_label_buf = np.empty(n, dtype=np.int8)
+            self._dt_label_buf = np.empty(n, dtype=np.int8)
+        lr_labels = self._lr_label_buf[:n]
+        dt_labels = self._dt_label_buf[:n]
+        np.greater_equal(lr_proba, threshold, out=lr_labels, casting='unsafe')
+        np.greater_equal(dt_proba, threshold, out=dt_labels, casting='unsafe')
+        return lr_proba, lr_labels, dt_proba, dt_labels
+
+    def predict(self, fv: List[float], threshold: float = 0.5) -> PredResult:
+        """
+        Predict probabilities and labels from both models for one flow.
+
+        Thin compatibility wrapper over predict_batch with N=1.
+
+        Args:
+            fv: list of 20 floats in the same order as training features.
+            threshold: probability threshold to label as malicious.
+
+        Returns:
+            PredResult with fields lr_proba, lr_label, dt_proba, dt_label.
+        """
+        x = np.asarray(fv, dtype=np.float32).reshape(1, -1)
+        lr_proba, lr_labels, dt_proba, dt_labels = self.predict_batch(x, threshold=threshold)
+        return PredResult(float(lr_proba[0]), int(lr_labels[0]),
+                          float(dt_proba[0]), int(dt_labels[0]))
@@ -13,9 +13,27 @@ Output per packet:
  udp.srcport, udp.dstport, ip.proto, frame.len, tcp.flags)
 """
 
+import struct
 import subprocess
-import time
-from typing import Generator, Tuple, List
+from socket import inet_aton
+from typing import Generator, Optional, Tuple, List
+
+import numpy as np
+
+from af_packet_runner import parse_frame
+
+# Struct-of-arrays record for one packet: numeric fields only, so a window of
+# packets can be processed with vectorized NumPy instead of per-packet Python
+PACKET_DTYPE = np.dtype([
+    ('ts', 'f8'),
+    ('src', 'u4'),
+    ('dst', 'u4'),
+    ('sport', 'u2'),
+    ('dport', 'u2'),
+    ('proto', 'u1'),
+    ('len', 'u2'),
+    ('flags', 'u2'),
+])
 
 # Fields extracted from tshark
 TSHARK_FIELDS: List[str] = [
@@ -32,17 +50,25 @@ TSHARK_FIELDS: List[str] = [
 ]
 
 
-def _build_tshark_command(iface: str) -> List[str]:
-    """Construct tshark command line with required fields."""
+def _build_tshark_command(iface: str, duration: float) -> List[str]:
+    """Construct tshark command line with required fields and autostop."""
     cmd = [
         'tshark', '-i', iface, '-l', '-n',
-        '-T', 'fields', '-E', 'separator=,', '-E', 'quote=d', '-E', 'occurrence=f'
+        '-a', f'duration:{max(1, round(duration))}',
+        '-T', 'fields', '-E', 'separator=,', '-E', 'quote=n', '-E', 'occurrence=f'
     ]
     for f in TSHARK_FIELDS:
         cmd += ['-e', f]
     return cmd
 
 
+# Padding tails reused when tshark emits fewer than 10 columns, indexed by
+# how many columns are missing — avoids building a fresh list per packet
+_PAD_TAILS: Tuple[List[str], ...] = tuple(
+    [''] * k for k in range(len(TSHARK_FIELDS) + 1)
+)
+
+
 def stream_packets(iface: str, duration: float) -> Generator[Tuple[str, ...], None, None]:
     """
     Run tshark for a fixed duration and yield parsed rows as tuples.
@@ -54,21 +80,150 @@ def stream_packets(iface: str, duration: float) -> Generator[Tuple[str, ...], No
     Yields:
         Tuple[str, ...]: values corresponding to TSHARK_FIELDS
     """
-    cmd = _build_tshark_command(iface)
-    start_time = time.time()
-    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True, bufsize=1)
+    cmd = _build_tshark_command(iface, duration)
+    # Binary pipe with a large buffer: line-buffered text mode would route
+    # every packet through TextIOWrapper decoding and per-line reads, so
+    # instead read 64 KiB chunks and split/decode lines in bulk below.
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                            bufsize=1 << 20)
     try:
-        for line in proc.stdout:
-            if time.time() - start_time >= duration:
-                break  # Stop after duration expires
-            line = line.strip()
-            if not line:
-                continue
-            cols = [c.strip('"') for c in line.split(',')]
-            if len(cols) < len(TSHARK_FIELDS):
-                cols += [''] * (len(TSHARK_FIELDS) - len(cols))
-            yield tuple(cols[:len(TSHARK_FIELDS)])
+        # Best effort: enlarge the kernel pipe so tshark doesn't stall
+        # behind a slow consumer during bursts (Linux-only fcntl).
+        import fcntl
+        fcntl.fcntl(proc.stdout.fileno(), fcntl.F_SETPIPE_SZ, 1 << 20)
+    except (ImportError, AttributeError, OSError, PermissionError):
+        pass
+    try:
+        # tshark self-terminates via '-a duration' and closes its stdout, so
+        # the loop needs no per-packet clock check — it just drains the pipe.
+        read = proc.stdout.read
+        tail = b''
+        while True:
+            chunk = read(65536)
+            if not chunk:
+                break
+            lines = (tail + chunk).split(b'\n')
+            tail = lines.pop()  # trailing incomplete line, if any
+            for raw in lines:
+                line = raw.strip().decode('ascii', 'replace')
+                if not line:
+                    continue
+                # quote=n above means no per-column strip('"'); capped split
+                # yields the 10 fixed columns without a throwaway comprehension
+                cols = line.split(',', 9)
+                if len(cols) < 10:
+                    cols += _PAD_TAILS[10 - len(cols)]
+                yield tuple(cols)
     finally:
         # Terminate tshark cleanly
         proc.terminate()
         proc.wait(timeout=2)
+
+
+def stream_packets_into(buf: np.ndarray, iface: str, duration: float
+                        ) -> Generator[np.ndarray, None, None]:
+    """
+    Capture into a preallocated struct-of-arrays buffer of PACKET_DTYPE records.
+
+    Alternative to stream_packets for numeric consumers: each packet's fields
+    are parsed to numbers once and written straight into `buf` — no per-packet
+    tuple of strings to re-parse downstream. IPs are packed big-endian u32
+    (struct.unpack('!I', inet_aton(ip))); malformed packets are skipped.
+
+    Args:
+        buf: caller-allocated array, e.g. np.empty(WINDOW_SIZE, dtype=PACKET_DTYPE)
+        iface: interface to capture on
+        duration: how long to capture (seconds)
+
+    Yields:
+        np.ndarray: filled view buf[:n] whenever the buffer fills, and once
+        more at end of capture; each view is valid until the next iteration.
+    """
+    n = 0
+    size = buf.shape[0]
+    for ts, src, dst, tsp, tdp, usp, udp, proto, flen, flags in stream_packets(iface, duration):
+        row = buf[n]
+        try:
+            row['ts'] = float(ts) if ts else 0.0
+            row['src'] = struct.unpack('!I', inet_aton(src))[0] if src else 0
+            row['dst'] = struct.unpack('!I', inet_aton(dst))[0] if dst else 0
+            row['sport'] = int(tsp or usp or 0)
+            row['dport'] = int(tdp or udp or 0)
+            row['proto'] = int(proto or 0)
+            row['len'] = int(flen or 0)
+            row['flags'] = int(flags, 0) if flags else 0
+        except (OSError, ValueError, OverflowError):
+            continue
+        n += 1
+        if n == size:
+            yield buf
+            n = 0
+    if n:
+        yield buf[:n]
+
+
+def _read_exact(read, n: int) -> Optional[bytes]:
+    """Read exactly n bytes from a stream; None on EOF/short read."""
+    chunks = []
+    while n:
+        chunk = read(n)
+        if not chunk:
+            return None
+        chunks.append(chunk)
+        n -= len(chunk)
+    return chunks[0] if len(chunks) == 1 else b''.join(chunks)
+
+
+def stream_packets_pcap(iface: str, duration: float) -> Generator[Tuple[str, ...], None, None]:
+    """
+    Capture with tshark writing raw pcap to stdout and parse frames in-process.
+
+    Avoids the per-packet text round-trip of stream_packets: tshark emits
+    binary pcap records (-F pcap -w -) and each Ethernet frame is parsed with
+    af_packet_runner.parse_frame, yielding the same TSHARK_FIELDS tuples.
+    tshark self-terminates via -a duration, so no per-packet clock check is
+    needed in the read loop.
+
+    Args:
+        iface: interface to capture on (e.g., 'eth0')
+        duration: how long to capture (seconds)
+
+    Yields:
+        Tuple[str, ...]: values corresponding to TSHARK_FIELDS
+    """
+    cmd = ['tshark', '-i', iface, '-F', 'pcap', '-w', '-',
+           '-a', f'duration:{max(1, round(duration))}']
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    read = proc.stdout.read
+    try:
+        header = _read_exact(read, 24)
+        if header is None:
+            return
+        magic = header[:4]
+        if magic in (b'\xa1\xb2\xc3\xd4', b'\xa1\xb2\x3c\x4d'):
+            endian = '>'
+        elif magic in (b'\xd4\xc3\xb2\xa1', b'\x4d\x3c\xb2\xa1'):
+            endian = '<'
+        else:
+            raise ValueError(f'Unrecognized pcap magic from tshark: {magic!r}')
+        nanos = magic in (b'\xa1\xb2\x3c\x4d', b'\x4d\x3c\xb2\xa1')
+        frac_div = 1e9 if nanos else 1e6
+        linktype = struct.unpack(endian + 'I', header[20:24])[0]
+        if linktype != 1:  # LINKTYPE_ETHERNET
+            raise ValueError(f'Unsupported pcap link type {linktype} (expected Ethernet)')
+
+        rec_hdr = struct.Struct(endian + 'IIII')
+        while True:
+            hdr = _read_exact(read, rec_hdr.size)
+            if hdr is None:
+                break  # tshark hit its duration and closed the stream
+            ts_sec, ts_frac, incl_len, _orig_len = rec_hdr.unpack(hdr)
+            buf = _read_exact(read, incl_len)
+            if buf is None:
+                break
+            pkt = parse_frame(buf, ts_sec + ts_frac / frac_div)
+            if pkt is not None:
+                yield pkt
+    finally:
+        proc.terminate()
+        proc.wait(timeout=2)
@@ -1,6 +1,10 @@
+import ipaddress
+import shutil
 import subprocess
 import sys
 import os
+import threading
+from typing import Iterable, List
 
 class XDPManager:
     """
@@ -9,26 +13,43 @@ class XDPManager:
     """
     def __init__(self, iface: str, xdp_cmd: str = "xdp-filter"):
         self.interface = iface
-        self.xdp_cmd = xdp_cmd
+        # Resolve the binary once so every invocation skips the PATH search
+        self.xdp_cmd = shutil.which(xdp_cmd) or xdp_cmd
         self.is_loaded = False
+
+        # Long-lived /bin/sh coprocess used by block_ip: each block becomes
+        # a pipe write instead of a fork+exec of xdp-filter (spawned lazily,
+        # respawned if it dies). The lock covers multi-threaded callers.
+        self._shell = None
+        self._shell_lock = threading.Lock()
+
+        # IPs already handed to xdp-filter, as packed ints: during a flood
+        # the same offender is re-detected every window, and a set lookup
+        # here means no duplicate command is ever issued for it.
+        self._blocked = set()
         
         # Ensure script is run with root permissions
         if os.geteuid() != 0:
             print("ERROR: XDP commands require root privileges (sudo).")
             sys.exit(1)
 
-    def _execute_xdp_command(self, command: str) -> tuple[bool, str]:
+    def _execute_xdp_command(self, args: List[str]) -> tuple[bool, str]:
         """
         Executes a subprocess command for xdp-filter.
+
+        Takes the arguments as an argv list and runs without a shell: no
+        /bin/sh fork per invocation, and arguments are passed verbatim
+        instead of being re-parsed by a shell.
+
         Returns: (Success status, Stderr output)
         """
-        full_cmd = f"{self.xdp_cmd} {command}"
-        print(f"Executing: {full_cmd}")
+        full_cmd = [self.xdp_cmd] + args
+        print(f"Executing: {' '.join(full_cmd)}")
 
         try:
             result = subprocess.run(
                 full_cmd,
-                shell=True,
+                shell=False,
                 check=True,
                 capture_output=True,
                 text=True
@@ -53,8 +74,8 @@ class XDPManager:
         """
         print(f"--- Initializing XDP filter on interface: {self.interface} ---")
         # Use 'skb' mode for compatibility (WSL2)
-        command = f"load {self.interface} -m skb" 
-        
+        command = ["load", self.interface, "-m", "skb"]
+
         success, stderr = self._execute_xdp_command(command)
         
         if success:
@@ -70,20 +91,121 @@ class XDPManager:
         print("Initialization failed. Cannot proceed with XDP operations.")
         return False
 
+    def _write_shell_command(self, line: str) -> bool:
+        """
+        Send one command line to the persistent /bin/sh coprocess.
+
+        xdp-filter has no batch-from-stdin mode, so a single long-running
+        shell stands in for one: each command is a ~40-byte pipe write plus
+        a flush instead of a several-ms fork+exec per call. The shell is
+        spawned on first use and respawned once if the pipe breaks.
+        """
+        with self._shell_lock:
+            for _ in range(2):
+                if self._shell is None or self._shell.poll() is not None:
+                    self._shell = subprocess.Popen(
+                        ["/bin/sh"],
+                        stdin=subprocess.PIPE,
+                        stdout=subprocess.DEVNULL,
+                        stderr=subprocess.DEVNULL,
+                        text=True
+                    )
+                try:
+                    self._shell.stdin.write(line + "\n")
+                    self._shell.stdin.flush()
+                    return True
+                except (BrokenPipeError, OSError):
+                    self._shell = None
+            return False
+
+    def _close_shell(self):
+        """Shut down the block coprocess, waiting for queued commands."""
+        with self._shell_lock:
+            if self._shell is not None:
+                try:
+                    self._shell.stdin.close()
+                    self._shell.wait(timeout=5)
+                except (OSError, subprocess.TimeoutExpired):
+                    self._shell.kill()
+                self._shell = None
+
     def block_ip(self, ip_address: str) -> bool:
         """
         Adds a source IP address to the XDP drop list (eBPF map).
-        Uses 'xdp-filter ip <addr>'
+        Uses 'xdp-filter ip <addr>' via the persistent coprocess.
         """
         if not self.is_loaded:
             print("WARNING: XDP filter is not loaded. Cannot block IP.")
             return False
 
-        print(f"!!! BLOCKING MALICIOUS IP: {ip_address} !!!")
+        # The address reaches a shell line, so validate it strictly first
+        # (it was parsed from untrusted packets).
+        try:
+            parsed = ipaddress.ip_address(ip_address)
+        except ValueError:
+            print(f"Skipping invalid IP address: {ip_address!r}")
+            return False
+
+        # Already in the drop map — nothing to do, and no subprocess traffic
+        ip_int = int(parsed)
+        if ip_int in self._blocked:
+            return True
+
+        addr = str(parsed)
+        print(f"!!! BLOCKING MALICIOUS IP: {addr} !!!")
         # FIX: 'xdp-filter ip' only needs the IP address as a positional argument for adding.
-        command = f"ip --mode src {ip_address}"
-        success, _ = self._execute_xdp_command(command)
-        return success
+        if self._write_shell_command(f"{self.xdp_cmd} ip --mode src {addr}"):
+            self._blocked.add(ip_int)
+            return True
+        return False
+
+    def block_ips(self, ip_list: Iterable[str]) -> bool:
+        """
+        Adds many source IP addresses to the XDP drop list in one subprocess.
+
+        Forking 'xdp-filter' per IP costs ~ms each, which is catastrophic when
+        a flood produces thousands of offenders. Direct eBPF map updates via
+        libbpf/bcc would be ideal, but neither binding is a dependency of this
+        project, so amortize instead: validate the addresses and feed one
+        'xdp-filter ip' line per address through a single shell process —
+        one fork+exec for the whole batch.
+        """
+        if not self.is_loaded:
+            print("WARNING: XDP filter is not loaded. Cannot block IPs.")
+            return False
+
+        addrs = []
+        new_ints = []
+        for ip in ip_list:
+            try:
+                parsed = ipaddress.ip_address(ip)
+            except ValueError:
+                print(f"Skipping invalid IP address: {ip!r}")
+                continue
+            ip_int = int(parsed)
+            if ip_int in self._blocked:
+                continue  # already in the drop map
+            addrs.append(str(parsed))
+            new_ints.append(ip_int)
+        if not addrs:
+            return True
+
+        print(f"!!! BLOCKING {len(addrs)} MALICIOUS IPs IN ONE BATCH !!!")
+        script = "\n".join(f"{self.xdp_cmd} ip --mode src {a}" for a in addrs)
+        try:
+            subprocess.run(
+                ["/bin/sh"],
+                input=script,
+                check=True,
+                capture_output=True,
+                text=True
+            )
+            self._blocked.update(new_ints)
+            return True
+        except subprocess.CalledProcessError as e:
+            print(f"ERROR: batch xdp-filter run failed with return code {e.returncode}")
+            print(f"Stderr:\n{e.stderr.strip()}")
+            return False
 
     def unload_xdp_filter(self) -> bool:
         """
@@ -92,9 +214,12 @@ class XDPManager:
         if not self.is_loaded:
             return True
 
+        # Drain pending block commands before tearing the program down
+        self._close_shell()
+
         print(f"\n--- Final Cleanup: Unloading XDP Program from {self.interface} ---")
         # Syntax: xdp-filter unload <ifname>
-        command = f"unload {self.interface}"
+        command = ["unload", self.interface]
         success, _ = self._execute_xdp_command(command)
         
         if success:
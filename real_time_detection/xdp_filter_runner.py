@@ -1,32 +1,46 @@
+import shutil
 import subprocess
 import os
 import sys
 import time
+from typing import List
 
 # --- Configuration ---
 # You must change this to the network interface XDP is running on (e.g., 'eth0' or 'enp1s0')
-INTERFACE = "eth0" 
+INTERFACE = "eth0"
 # The script must be run using 'sudo python3 xdp_filter_runner.py'
 XDP_FILTER_CMD = "xdp-filter"
+# Resolved once at import so each invocation skips the PATH search
+_XDP_FILTER_PATH = shutil.which(XDP_FILTER_CMD) or XDP_FILTER_CMD
 
-def _execute_xdp_command(command: str):
+# get_status TTL cache: operator loops poll status far faster than it
+# changes, and each call is a full fork+exec of xdp-filter. Results are
+# reused for _STATUS_TTL seconds (monotonic clock) and the cache is
+# invalidated whenever block_ip/unblock_ip mutates the filter.
+_STATUS_TTL = 1.0
+_status_cache = {'t': 0.0, 'val': None}
+
+def _execute_xdp_command(args: List[str]):
     """
     Executes the constructed xdp-filter command using subprocess.
     Includes basic error handling for command execution.
-    
+
+    Takes the arguments as an argv list and runs without a shell, so each
+    call is one fork+exec of xdp-filter instead of /bin/sh plus xdp-filter.
+
     Returns:
         tuple[bool, str]: (Success status, Stderr output)
     """
-    # The command parameter already contains the subcommand and arguments, 
-    # e.g., "load eth0 -m skb" or "ip add 1.2.3.4"
-    full_cmd = f"{XDP_FILTER_CMD} {command}"
-    print(f"Executing: {full_cmd}")
+    # The args parameter already contains the subcommand and arguments,
+    # e.g., ["load", "eth0", "-m", "skb"] or ["ip", "add", "1.2.3.4"]
+    full_cmd = [_XDP_FILTER_PATH] + args
+    print(f"Executing: {' '.join(full_cmd)}")
 
     try:
         # Run the command and capture output
         result = subprocess.run(
             full_cmd,
-            shell=True,
+            shell=False,
             check=True,  # Raise an exception for non-zero exit codes
             capture_output=True,
             text=True
@@ -35,7 +49,7 @@ def _execute_xdp_command(command: str):
         # Optionally print stdout/stderr for debugging
         if result.stdout:
             # Only print status output if it's the 'status' command
-            if command.startswith("status"):
+            if args[0] == "status":
                 print(f"Stdout:\n{result.stdout.strip()}")
         if result.stderr:
             print(f"Stderr:\n{result.stderr.strip()}")
@@ -64,8 +78,8 @@ def initialize_xdp_filter():
     """
     print(f"--- Initializing XDP filter on interface: {INTERFACE} ---")
     # Syntax: xdp-filter load <ifname> [options]
-    command = f"load {INTERFACE} -m skb" 
-    
+    command = ["load", INTERFACE, "-m", "skb"]
+
     success, stderr = _execute_xdp_command(command)
     
     if success:
@@ -89,10 +103,11 @@ def block_ip(ip_address: str) -> bool:
         return False
         
     print(f"\n--- BLOCKING IP: {ip_address} on {INTERFACE} ---")
-    # FIX: Removed the INTERFACE argument. 'xdp-filter ip' only takes the IP address 
+    # FIX: Removed the INTERFACE argument. 'xdp-filter ip' only takes the IP address
     # as the required positional argument for addition (default mode).
-    command = f"ip --mode src {ip_address}"
+    command = ["ip", "--mode", "src", ip_address]
     success, _ = _execute_xdp_command(command)
+    _status_cache['val'] = None  # status changed; drop the cached copy
     return success
 
 def unblock_ip(ip_address: str) -> bool:
@@ -106,18 +121,29 @@ def unblock_ip(ip_address: str) -> bool:
     print(f"\n--- UNBLOCKING IP: {ip_address} on {INTERFACE} ---")
     # FIX: Removed the INTERFACE argument and used the standard '--remove' flag 
     # for deletion as per 'xdp-filter ip --help'.
-    command = f"ip --mode src --remove {ip_address}" 
+    command = ["ip", "--mode", "src", "--remove", ip_address]
     success, _ = _execute_xdp_command(command)
+    _status_cache['val'] = None  # status changed; drop the cached copy
     return success
 
 def get_status():
     """
     Displays the current status of the xdp-filter, including blocked IPs.
+
+    Results are served from a short-TTL cache so tight polling loops cost
+    one xdp-filter exec per second instead of one per call; block_ip and
+    unblock_ip invalidate the cache so mutations show up immediately.
     """
+    now = time.monotonic()
+    if _status_cache['val'] is not None and now - _status_cache['t'] < _STATUS_TTL:
+        return _status_cache['val']
+
     print(f"\n--- Current XDP Filter Status on {INTERFACE} ---")
-    # Syntax: xdp-filter status <ifname> 
-    command = f"status"
+    # Syntax: xdp-filter status <ifname>
+    command = ["status"]
     success, _ = _execute_xdp_command(command)
+    _status_cache['t'] = now
+    _status_cache['val'] = success
     return success
 
 if __name__ == "__main__":
@@ -160,6 +186,6 @@ if __name__ == "__main__":
     # 6. Final cleanup (optional, unloads the entire program)
     print("\n--- Final Cleanup: Unloading XDP Program ---")
     # Syntax: xdp-filter unload <ifname>
-    success, _ = _execute_xdp_command(f"unload {INTERFACE}")
+    success, _ = _execute_xdp_command(["unload", INTERFACE])
     
     print("\nScript finished.")